@@ -18,6 +18,7 @@ Refer to :mod:`junos <salt.proxy.junos>` for information on connecting to junos
 from __future__ import absolute_import, print_function, unicode_literals
 import logging
 import os
+import shutil
 from functools import wraps
 
 try:
@@ -175,6 +176,14 @@ def rpc(cmd=None, dest=None, **kwargs):
     interface_name
       Name of the interface to query
 
+    args
+      List of additional arguments of the RPC. Dictionaries are merged into
+      the keyword arguments, anything else is sent as a flag, e.g. ``terse``
+
+    raw_xml : False
+      When ``True`` and ``dest`` is given, the XML reply is only written to
+      ``dest`` and is not returned, which saves parsing large replies
+
     CLI Example:
 
     .. code-block:: bash
@@ -209,6 +218,13 @@ def rpc(cmd=None, dest=None, **kwargs):
     else:
         op.update(kwargs)
 
+    raw_xml = op.pop('raw_xml', False)
+    for arg in op.pop('args', None) or []:
+        if isinstance(arg, dict):
+            op.update(arg)
+        else:
+            op[six.text_type(arg)] = True
+
     if cmd in ['get-config', 'get_config']:
         filter_reply = None
         if 'filter' in op:
@@ -249,6 +265,9 @@ def rpc(cmd=None, dest=None, **kwargs):
     elif format_ == 'json':
         # Earlier it was ret['message']
         ret['rpc_reply'] = reply
+    elif raw_xml and dest:
+        # The reply is only written to dest, no need to parse it
+        ret['message'] = 'RPC reply written to {0}'.format(dest)
     else:
         # Earlier it was ret['message']
         ret['rpc_reply'] = jxmlease.parse(etree.tostring(reply))
@@ -757,6 +776,33 @@ def shutdown(**kwargs):
     return ret
 
 
+def _copy_config(path, dest, template_vars, skip_render=False):
+    '''
+    Copies the configuration file from path to dest, rendering it through the
+    template engine. When skip_render is set the file is copied as it is,
+    unless it turns out to contain template markup.
+    '''
+    if skip_render:
+        # cache_file resolves the same sources as get_template does
+        cached = __salt__['cp.cache_file'](path)
+        if not cached:
+            return
+        try:
+            with salt.utils.files.fopen(cached, 'r') as fp:
+                content = fp.read()
+        except (IOError, OSError):
+            return
+        if not any(markup in content for markup in ('{{', '{%', '{#')):
+            shutil.copyfile(cached, dest)
+            return
+        log.debug('Rendering %s as it contains template markup', path)
+        path = cached
+    __salt__['cp.get_template'](
+        path,
+        dest,
+        template_vars=template_vars)
+
+
 @timeoutDecorator
 def install_config(path=None, **kwargs):
     '''
@@ -822,6 +868,11 @@ def install_config(path=None, **kwargs):
 
           {{ template_vars["var_name"] }}
 
+    skip_render : False
+      Set to ``True`` to copy the file without rendering it through the
+      template engine. The file is still rendered if it contains template
+      markup.
+
     CLI Examples:
 
     .. code-block:: bash
@@ -855,10 +906,8 @@ def install_config(path=None, **kwargs):
         template_vars = op["template_vars"]
 
     template_cached_path = salt.utils.files.mkstemp()
-    __salt__['cp.get_template'](
-        path,
-        template_cached_path,
-        template_vars=template_vars)
+    _copy_config(path, template_cached_path, template_vars,
+                 op.pop('skip_render', False))
 
     if not os.path.isfile(template_cached_path):
         ret['message'] = 'Invalid file path.'
@@ -1105,7 +1154,9 @@ def file_copy(src=None, dest=None):
     Copies the file from the local device to the junos device
 
     src
-        The source path where the file is kept.
+        The source path where the file is kept. A list of paths can be given
+        to copy several files into the dest directory over a single SCP
+        connection.
 
     dest
         The destination path on the where the file will be copied
@@ -1115,6 +1166,7 @@ def file_copy(src=None, dest=None):
     .. code-block:: bash
 
         salt 'device_name' junos.file_copy /home/m2/info.txt info_copy.txt
+        salt 'device_name' junos.file_copy '["/home/m2/info.txt", "/home/m2/motd.txt"]' /var/tmp
     '''
     conn = __proxy__['junos.conn']()
     ret = {}
@@ -1125,7 +1177,8 @@ def file_copy(src=None, dest=None):
             'Please provide the absolute path of the file to be copied.'
         ret['out'] = False
         return ret
-    if not os.path.isfile(src):
+    sources = src if isinstance(src, list) else [src]
+    if not sources or not all(os.path.isfile(source) for source in sources):
         ret['message'] = 'Invalid source file path'
         ret['out'] = False
         return ret
@@ -1138,9 +1191,10 @@ def file_copy(src=None, dest=None):
 
     try:
         with SCP(conn, progress=True) as scp:
-            scp.put(src, dest)
+            for source in sources:
+                scp.put(source, dest)
         ret['message'] = 'Successfully copied file from {0} to {1}'.format(
-            src, dest)
+            ', '.join(sources), dest)
     except Exception as exception:
         ret['message'] = 'Could not copy file : "{0}"'.format(exception)
         ret['out'] = False
@@ -1201,6 +1255,7 @@ def unlock():
     return ret
 
 
+@timeoutDecorator
 def load(path=None, **kwargs):
     '''
     Loads the configuration from the file provided onto the device.
@@ -1233,6 +1288,9 @@ def load(path=None, **kwargs):
         affected by the changed configuration elements parse the new
         configuration. This action is supported from PyEZ 2.1.
 
+    dev_timeout : 30
+        The NETCONF RPC timeout (in seconds)
+
     template_vars
       Variables to be passed into the template processing engine in addition to
       those present in pillar, the minion configuration, grains, etc.  You may
@@ -1242,6 +1300,11 @@ def load(path=None, **kwargs):
 
           {{ template_vars["var_name"] }}
 
+    skip_render : False
+      Set to ``True`` to copy the file without rendering it through the
+      template engine. The file is still rendered if it contains template
+      markup.
+
     CLI Examples:
 
     .. code-block:: bash
@@ -1277,10 +1340,8 @@ def load(path=None, **kwargs):
         template_vars = op["template_vars"]
 
     template_cached_path = salt.utils.files.mkstemp()
-    __salt__['cp.get_template'](
-        path,
-        template_cached_path,
-        template_vars=template_vars)
+    _copy_config(path, template_cached_path, template_vars,
+                 op.pop('skip_render', False))
 
     if not os.path.isfile(template_cached_path):
         ret['message'] = 'Invalid file path.'
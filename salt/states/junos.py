@@ -15,22 +15,152 @@ Refer to :mod:`junos <salt.proxy.junos>` for information on connecting to junos
 '''
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import copy
 import logging
 from functools import wraps
+from multiprocessing.pool import ThreadPool
 
-log = logging.getLogger()
+# Import Salt libs
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+# Initial return of the states, copied by every state. The copy is shallow,
+# every state sets its changes to the reply of the junos function.
+_RET_TEMPLATE = {'name': None, 'changes': {}, 'result': True, 'comment': ''}
+
+# Minimum NETCONF RPC timeout (in seconds) of the long running states, used
+# when the state is not given a timeout
+_DEFAULT_TIMEOUTS = {'commit': 300,
+                     'install_config': 600,
+                     'install_os': 1800,
+                     'load': 120,
+                     'rollback': 120}
+
+# RPCs reading the configuration of the device
+_CONFIG_RPCS = ('get-config', 'get_config',
+                'get-configuration', 'get_configuration')
+
+# Functions which may change the configuration of the device, and so
+# invalidate the cached configuration replies
+_CFG_CHANGING = ('junos.set_hostname', 'junos.commit', 'junos.rollback',
+                 'junos.install_config', 'junos.load', 'junos.zeroize',
+                 'junos.install_os', 'junos.shutdown')
+
+
+def _finalize(ret, res):
+    '''
+    Sets the result of the state from the reply of the junos function, so
+    that the states requiring a failed state are not run. The error message
+    of a failed reply is used as the comment; a successful one is left in
+    the changes, as it may be the whole command output.
+    '''
+    ret['result'] = res.get('out', True)
+    message = res.get('message')
+    if not ret['result'] and isinstance(message, six.string_types):
+        ret['comment'] = message
 
 
 def resultdecorator(function):
     @wraps(function)
     def wrapper(*args, **kwargs):
         ret = function(*args, **kwargs)
-        ret['result'] = ret['changes']['out']
+        _finalize(ret, ret['changes'])
         return ret
 
     return wrapper
 
 
+def _default_timeout(op, kwargs):
+    '''
+    Sets ``dev_timeout`` to the default timeout of the given operation unless
+    a timeout was given, or the device already uses a longer one.
+    '''
+    if 'dev_timeout' in kwargs or 'timeout' in kwargs:
+        return
+    current = 0
+    if 'junos.conn' in __proxy__:
+        current = __proxy__['junos.conn']().timeout or 0
+    kwargs['dev_timeout'] = max(current, _DEFAULT_TIMEOUTS[op])
+
+
+def _call(fun, *args, **kwargs):
+    '''
+    Executes the given junos function.
+    '''
+    try:
+        return __salt__[fun](*args, **kwargs)
+    finally:
+        if fun in _CFG_CHANGING:
+            _bump_cfg_epoch()
+
+
+def _bump_cfg_epoch():
+    '''
+    Marks the configuration of the device as changed, dropping the replies
+    cached by :py:func:`_cached_call`.
+    '''
+    __context__['junos.cfg_epoch'] = __context__.get('junos.cfg_epoch', 0) + 1
+    for key in [key for key in __context__
+                if isinstance(key, tuple) and key[0] == 'junos_cache']:
+        del __context__[key]
+
+
+def _cached_call(fun, *args, **kwargs):
+    '''
+    Executes the given junos function reading the configuration like
+    :py:func:`_call`. The successful replies are kept in ``__context__`` until
+    the configuration changes, so that the same call made again later in the
+    state run does not hit the device. Operational data must not be read
+    through this function, as it can change without any configuration change.
+    '''
+    key = ('junos_cache', fun, __context__.get('junos.cfg_epoch', 0),
+           repr((args, sorted(six.iteritems(kwargs)))))
+    if key not in __context__:
+        reply = _call(fun, *args, **kwargs)
+        if not reply.get('out', False):
+            return reply
+        __context__[key] = reply
+    else:
+        log.debug('Using the cached reply of %s', fun)
+    return copy.deepcopy(__context__[key])
+
+
+def _run_concurrent(fun, targets, *args, **kwargs):
+    '''
+    Executes the given junos function once for each of the targets, passed as
+    its first argument, using a pool of ``max_workers`` threads. The replies
+    are merged into a single one, keyed by target under ``results``.
+    '''
+    max_workers = kwargs.pop('max_workers', 4)
+
+    def _run(target):
+        try:
+            return __salt__[fun](target, *args, **kwargs)
+        except Exception as exception:
+            return {'out': False,
+                    'message': 'Execution failed due to "{0}"'.format(
+                        exception)}
+
+    pool = ThreadPool(max(1, min(max_workers, len(targets))))
+    try:
+        replies = pool.map(_run, targets)
+    finally:
+        pool.close()
+        pool.join()
+
+    ret = {'out': True, 'results': dict(zip(targets, replies))}
+    failed = [target for target, reply in zip(targets, replies)
+              if not reply.get('out', False)]
+    if failed:
+        ret['message'] = '{0} failed for: {1}'.format(fun, ', '.join(failed))
+        ret['out'] = False
+    else:
+        ret['message'] = 'Successfully executed {0} for {1} target(s).'.format(
+            fun, len(targets))
+    return ret
+
+
 @resultdecorator
 def rpc(name, dest=None, format='xml', args=None, **kwargs):
     '''
@@ -59,6 +189,9 @@ def rpc(name, dest=None, format='xml', args=None, **kwargs):
         * format:
           The format in which the rpc reply must be stored in file specified in the dest
           (used only when dest is specified) (default = xml)
+          When dest is specified with the xml format, the reply is only
+          stored in the file and is not returned, unless raw_xml is set to
+          False.
         * kwargs: keyworded arguments taken by rpc call like-
             * timeout:
               Set NETCONF RPC timeout. Can be used for commands which
@@ -69,17 +202,36 @@ def rpc(name, dest=None, format='xml', args=None, **kwargs):
               Amount of information you want.
             * interface_name:
               Name of the interface whose information you want.
+            * inherit:
+              Only used with the 'get-config' and 'get-configuration' rpcs.
+              Set to 'inherit' to get the configuration with the
+              configuration groups already applied, which the device
+              expands faster than the plain configuration when groups are
+              used. (default = None)
+            * raw_xml:
+              Only used when dest is given with the xml format. Set to False
+              to also return the parsed reply as rpc_reply in the changes.
+              (default = True)
+        * args:
+          List of additional arguments of the rpc. Dictionaries are merged
+          into the keyworded arguments, anything else is sent as a flag.
+          (default = None)
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    if args is not None:
-        ret['changes'] = __salt__['junos.rpc'](
-            name,
-            dest,
-            format,
-            *args,
-            **kwargs)
-    else:
-        ret['changes'] = __salt__['junos.rpc'](name, dest, format, **kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    rpc_name = name
+    if name in _CONFIG_RPCS and kwargs.get('inherit'):
+        # get-config sends its options as attributes of <get-configuration>
+        rpc_name = 'get-config'
+    if dest and format == 'xml':
+        # The reply is stored in dest, it is not parsed to be returned too
+        kwargs.setdefault('raw_xml', True)
+    read_only = name.replace('_', '-').startswith('get-')
+    call = _cached_call if name in _CONFIG_RPCS and dest is None else _call
+    ret['changes'] = call('junos.rpc', rpc_name, dest, format=format,
+                          args=args, **kwargs)
+    if not read_only:
+        _bump_cfg_epoch()
     return ret
 
 
@@ -112,8 +264,9 @@ def set_hostname(name, **kwargs):
               the given time unless the commit is confirmed.
 
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.set_hostname'](name, **kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    ret['changes'] = _call('junos.set_hostname', name, **kwargs)
     return ret
 
 
@@ -135,7 +288,7 @@ def commit(name, **kwargs):
         * kwargs: Keyworded arguments which can be provided like-
             * timeout:
               Set NETCONF RPC timeout. Can be used for commands which take a \
-              while to execute. (default = 30 seconds)
+              while to execute. (default = 300 seconds)
             * comment:
               Provide a comment to the commit. (default = None)
             * confirm:
@@ -156,8 +309,10 @@ def commit(name, **kwargs):
             * detail:
               When true return commit detail.
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.commit'](**kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    _default_timeout('commit', kwargs)
+    ret['changes'] = _call('junos.commit', **kwargs)
     return ret
 
 
@@ -180,7 +335,7 @@ def rollback(name, id, **kwargs):
         * kwargs: Keyworded arguments which can be provided like-
             * timeout:
               Set NETCONF RPC timeout. Can be used for commands which
-              take a while to execute. (default = 30 seconds)
+              take a while to execute. (default = 120 seconds)
             * comment:
               Provide a comment to the commit. (default = None)
             * confirm:
@@ -191,8 +346,10 @@ def rollback(name, id, **kwargs):
               Path to the file where any diffs will be written. (default = None)
 
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.rollback'](id, **kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    _default_timeout('rollback', kwargs)
+    ret['changes'] = _call('junos.rollback', id=id, **kwargs)
     return ret
 
 
@@ -200,6 +357,8 @@ def rollback(name, id, **kwargs):
 def diff(name, d_id):
     '''
     Gets the difference between the candidate and the current configuration.
+    The diff is not fetched again by the following diff states of the same
+    run, until the configuration is changed.
 
     .. code-block:: yaml
 
@@ -213,8 +372,9 @@ def diff(name, d_id):
         * id:
           The rollback id value [0-49]. (default = 0)
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.diff'](d_id)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    ret['changes'] = _cached_call('junos.diff', id=d_id)
     return ret
 
 
@@ -245,9 +405,30 @@ def cli(name, **kwargs):
             * dest:
               The destination file where the CLI output can be stored.\
                (default = None)
+            * inherit:
+              Only used with 'show configuration' commands. Set to True to\
+               display the configuration with the configuration groups\
+               already applied, which the device expands faster than the\
+               plain configuration when groups are used. (default = False)
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.cli'](name, **kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    command = name
+    inherit = kwargs.pop('inherit', False)
+    if inherit and name.split()[:2] == ['show', 'configuration'] \
+            and 'display inheritance' not in name:
+        head, pipe, tail = name.partition('|')
+        command = '{0} | display inheritance'.format(head.rstrip())
+        if pipe:
+            command = '{0} |{1}'.format(command, tail)
+    read_only = name.strip().startswith('show')
+    if name.split()[:2] == ['show', 'configuration'] \
+            and kwargs.get('dest') is None:
+        ret['changes'] = _cached_call('junos.cli', command, **kwargs)
+    else:
+        ret['changes'] = _call('junos.cli', command, **kwargs)
+    if not read_only:
+        _bump_cfg_epoch()
     return ret
 
 
@@ -273,8 +454,9 @@ def shutdown(name, **kwargs):
             * in_min:
               Specify delay in minutes for shutdown
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.shutdown'](**kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    ret['changes'] = _call('junos.shutdown', **kwargs)
     return ret
 
 
@@ -314,9 +496,11 @@ def install_config(name, **kwargs):
 
     template_vars
       The dictionary of data for the jinja variables present in the jinja
-      template
+      template. When no template_vars are given the file is copied to the device
+      without going through the template engine, unless it contains
+      template markup.
 
-    timeout : 30
+    timeout : 600
       Set NETCONF RPC timeout. Can be used for commands which take a while to
       execute.
 
@@ -345,8 +529,13 @@ def install_config(name, **kwargs):
           master use :py:func:`cp.push <salt.modules.cp.push>`.
 
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.install_config'](name, **kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    _default_timeout('install_config', kwargs)
+    if 'template_vars' not in kwargs:
+        # Plain configuration, only rendered if it contains template markup
+        kwargs.setdefault('skip_render', True)
+    ret['changes'] = _call('junos.install_config', name, **kwargs)
     return ret
 
 
@@ -362,8 +551,9 @@ def zeroize(name):
 
     name: can be anything
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.zeroize']()
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    ret['changes'] = _call('junos.zeroize')
     return ret
 
 
@@ -390,7 +580,7 @@ def install_os(name, **kwargs):
         * kwargs: keyworded arguments to be given such as timeout, reboot etc
             * timeout:
               Set NETCONF RPC timeout. Can be used to RPCs which
-              take a while to execute. (default = 30 seconds)
+              take a while to execute. (default = 1800 seconds)
             * reboot:
               Whether to reboot after installation (default = False)
             * no_copy:
@@ -398,13 +588,16 @@ def install_os(name, **kwargs):
               (default = False)
 
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.install_os'](name, **kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    _default_timeout('install_os', kwargs)
+    ret['changes'] = _call('junos.install_os', name, **kwargs)
     return ret
 
 
 @resultdecorator
-def file_copy(name, dest=None, **kwargs):
+def file_copy(name, dest=None, files=None, concurrent=False, max_workers=4,
+              **kwargs):
     '''
     Copies the file from the local device to the junos device.
 
@@ -415,15 +608,53 @@ def file_copy(name, dest=None, **kwargs):
                 - file_copy
                 - dest: info_copy.txt
 
+    Several files can be copied at once by listing them in files. They are
+    copied into the dest directory one after the other over a single SCP
+    connection, or concurrently if concurrent is set.
+
+    .. code-block:: yaml
+
+            copy the files:
+              junos:
+                - file_copy
+                - files:
+                  - /home/m2/info.txt
+                  - /home/m2/motd.txt
+                - dest: /var/tmp
+                - concurrent: True
+
     Parameters:
       Required
         * src:
           The sorce path where the file is kept.
         * dest:
           The destination path where the file will be copied.
+      Optional
+        * files:
+          List of files to copy into dest instead of name. (default = None)
+        * concurrent:
+          Copy the files concurrently in threads, each one over its own SSH
+          login to the device. This is unrelated to Salt's parallel state
+          keyword, which runs the whole state in a separate process.
+          (default = False)
+        * max_workers:
+          Maximum number of files copied at the same time when concurrent is
+          set. Each copy is a separate login, so keep this below the
+          connection-limit and rate-limit configured for ssh under
+          ``system services`` on the device, or the extra logins are
+          refused. (default = 4)
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.file_copy'](name, dest, **kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    if files and concurrent:
+        ret['changes'] = _run_concurrent(
+            'junos.file_copy',
+            files,
+            dest,
+            max_workers=max_workers,
+            **kwargs)
+        return ret
+    ret['changes'] = _call('junos.file_copy', files or name, dest, **kwargs)
     return ret
 
 
@@ -444,8 +675,9 @@ def lock(name):
               junos.lock
 
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.lock']()
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    ret['changes'] = _call('junos.lock')
     return ret
 
 
@@ -460,8 +692,9 @@ def unlock(name):
               junos.unlock
 
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.unlock']()
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    ret['changes'] = _call('junos.unlock')
     return ret
 
 
@@ -515,15 +748,28 @@ def load(name, **kwargs):
         affected by the changed configuration elements parse the new
         configuration. This action is supported from PyEZ 2.1 (default = False)
 
+    dev_timeout : 120
+        Set NETCONF RPC timeout. Can be used for commands which take a while to
+        execute.
+
     template_vars
       Variables to be passed into the template processing engine in addition
       to those present in __pillar__, __opts__, __grains__, etc.
       You may reference these variables in your template like so:
       {{ template_vars["var_name"] }}
 
+      When no template_vars are given the file is copied to the device
+      without going through the template engine, unless it contains
+      template markup.
+
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.load'](name, **kwargs)
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    _default_timeout('load', kwargs)
+    if 'template_vars' not in kwargs:
+        # Plain configuration, only rendered if it contains template markup
+        kwargs.setdefault('skip_render', True)
+    ret['changes'] = _call('junos.load', name, **kwargs)
     return ret
 
 
@@ -531,7 +777,9 @@ def load(name, **kwargs):
 def commit_check(name):
     '''
 
-    Perform a commit check on the configuration.
+    Perform a commit check on the configuration. A successful commit check is
+    not sent again to the device by the following commit_check states of the
+    same run, until the configuration is changed.
 
     .. code-block:: yaml
 
@@ -539,6 +787,7 @@ def commit_check(name):
           junos.commit_check
 
     '''
-    ret = {'name': name, 'changes': {}, 'result': True, 'comment': ''}
-    ret['changes'] = __salt__['junos.commit_check']()
+    ret = _RET_TEMPLATE.copy()
+    ret['name'] = name
+    ret['changes'] = _cached_call('junos.commit_check')
     return ret
@@ -7,7 +7,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 # Import test libs
 from tests.support.mixins import LoaderModuleMockMixin, XMLEqualityMixin
-from tests.support.mock import patch, mock_open, PropertyMock, call, ANY
+from tests.support.mock import patch, mock_open, PropertyMock, call, ANY, MagicMock
 from tests.support.unit import skipIf, TestCase
 
 # Import 3rd-party libs
@@ -1396,6 +1396,22 @@ class Test_Junos_Module(TestCase, LoaderModuleMockMixin, XMLEqualityMixin):
                     src='test/src/file'),
                 ret)
 
+    def test_file_copy_multiple_files(self):
+        with patch('salt.modules.junos.SCP') as mock_scp, \
+                patch('os.path.isfile') as mock_isfile:
+            mock_isfile.return_value = True
+            ret = junos.file_copy(dest='/var/tmp',
+                                  src=['test/src/file1', 'test/src/file2'])
+            mock_scp.assert_called_once_with(ANY, progress=True)
+            mock_put = mock_scp.return_value.__enter__.return_value.put
+            mock_put.assert_has_calls([call('test/src/file1', '/var/tmp'),
+                                       call('test/src/file2', '/var/tmp')])
+            self.assertEqual(
+                ret,
+                {'out': True,
+                 'message': 'Successfully copied file from test/src/file1, '
+                            'test/src/file2 to /var/tmp'})
+
     def test_file_copy_exception(self):
         with patch('salt.modules.junos.SCP') as mock_scp, \
                 patch('os.path.isfile') as mock_isfile:
@@ -1486,6 +1502,17 @@ class Test_Junos_Module(TestCase, LoaderModuleMockMixin, XMLEqualityMixin):
             )
             self.assertEqualXML(etree.tostring(args[0][0]), expected_rpc)
 
+    def test_rpc_get_interface_information_with_args(self):
+        with patch('jnpr.junos.device.Device.execute') as mock_execute:
+            junos.rpc('get-interface-information', format='text',
+                      args=['terse', {'interface_name': 'lo0'}])
+            args = mock_execute.call_args
+            expected_rpc = (
+                    '<get-interface-information format="text">'
+                    '<terse/><interface-name>lo0</interface-name></get-interface-information>'
+            )
+            self.assertEqualXML(etree.tostring(args[0][0]), expected_rpc)
+
     def test_rpc_get_chassis_inventory_filter_as_arg(self):
         with patch('salt.modules.junos.jxmlease.parse') as mock_jxmlease, \
                 patch('salt.modules.junos.etree.tostring') as mock_tostring, \
@@ -1533,6 +1560,23 @@ class Test_Junos_Module(TestCase, LoaderModuleMockMixin, XMLEqualityMixin):
                 writes = m_open.write_calls()
                 assert writes == ['xml rpc reply'], writes
 
+    def test_rpc_write_file_raw_xml(self):
+        with patch('salt.modules.junos.jxmlease.parse') as mock_parse, \
+                patch('salt.modules.junos.etree.tostring') as mock_tostring, \
+                patch('jnpr.junos.device.Device.execute') as mock_execute:
+            mock_tostring.return_value = 'xml rpc reply'
+            with patch('salt.utils.files.fopen', mock_open(), create=True) as m_open:
+                ret = junos.rpc('get-chassis-inventory', '/path/to/file',
+                                raw_xml=True)
+                writes = m_open.write_calls()
+                assert writes == ['xml rpc reply'], writes
+            mock_parse.assert_not_called()
+            self.assertEqual(
+                ret,
+                {'out': True,
+                 'message': 'RPC reply written to /path/to/file'})
+            self.assertIsNone(mock_execute.call_args[0][0].find('raw-xml'))
+
     def test_lock_success(self):
         ret_exp = {'out': True, 'message': 'Successfully locked the configuration.'}
         ret = junos.lock()
@@ -1666,6 +1710,107 @@ class Test_Junos_Module(TestCase, LoaderModuleMockMixin, XMLEqualityMixin):
             mock_load.assert_called_with(format='text', merge=True, path='/path/to/file')
             self.assertEqual(ret, ret_exp)
 
+    def test_load_with_dev_timeout(self):
+        dev = self.make_connect()
+        timeouts = []
+        with patch.dict(junos.__proxy__,
+                        {'junos.conn': MagicMock(return_value=dev)}), \
+                patch('os.path.getsize') as mock_getsize, \
+                patch('jnpr.junos.utils.config.Config.load') as mock_load, \
+                patch('salt.utils.files.mkstemp') as mock_mkstmp, \
+                patch('os.path.isfile') as mock_isfile:
+            mock_getsize.return_value = 1000
+            mock_mkstmp.return_value = '/path/to/file'
+            mock_isfile.return_value = True
+            mock_load.side_effect = lambda **kwargs: timeouts.append(
+                dev.timeout)
+            junos.load('/path/to/file', dev_timeout=120)
+            mock_load.assert_called_with(format='text', path='/path/to/file')
+            self.assertEqual(timeouts, [120])
+            self.assertEqual(dev.timeout, 30)
+
+    def test_load_skip_render(self):
+        ret_exp = {'out': True, 'message': 'Successfully loaded the configuration.'}
+        mock_cache_file = MagicMock(return_value='/cache/file.set')
+        mock_get_template = MagicMock()
+        with patch('os.path.getsize') as mock_getsize, \
+                patch('jnpr.junos.utils.config.Config.load') as mock_load, \
+                patch('salt.utils.files.mkstemp') as mock_mkstmp, \
+                patch('salt.utils.files.fopen',
+                      mock_open(read_data='set system host-name r1')), \
+                patch('shutil.copyfile') as mock_copyfile, \
+                patch('os.path.isfile') as mock_isfile, \
+                patch.dict(junos.__salt__,
+                           {'cp.cache_file': mock_cache_file,
+                            'cp.get_template': mock_get_template}):
+            mock_getsize.return_value = 1000
+            mock_mkstmp.return_value = '/path/to/file'
+            mock_isfile.return_value = True
+            ret = junos.load('salt://path/to/file.set', skip_render=True)
+            mock_cache_file.assert_called_with('salt://path/to/file.set')
+            mock_copyfile.assert_called_with('/cache/file.set',
+                                             '/path/to/file')
+            mock_get_template.assert_not_called()
+            mock_load.assert_called_with(format='set', path='/path/to/file')
+            self.assertEqual(ret, ret_exp)
+
+    def test_load_skip_render_local_path(self):
+        ret_exp = {'out': True, 'message': 'Successfully loaded the configuration.'}
+        mock_cache_file = MagicMock(return_value='/srv/cfg/x.set')
+        with patch('os.path.getsize') as mock_getsize, \
+                patch('jnpr.junos.utils.config.Config.load') as mock_load, \
+                patch('salt.utils.files.mkstemp') as mock_mkstmp, \
+                patch('salt.utils.files.fopen',
+                      mock_open(read_data='set system host-name r1')), \
+                patch('shutil.copyfile') as mock_copyfile, \
+                patch('os.path.isfile') as mock_isfile, \
+                patch.dict(junos.__salt__,
+                           {'cp.cache_file': mock_cache_file}):
+            mock_getsize.return_value = 1000
+            mock_mkstmp.return_value = '/path/to/file'
+            mock_isfile.return_value = True
+            ret = junos.load('/srv/cfg/x.set', skip_render=True)
+            mock_cache_file.assert_called_with('/srv/cfg/x.set')
+            mock_copyfile.assert_called_with('/srv/cfg/x.set', '/path/to/file')
+            mock_load.assert_called_with(format='set', path='/path/to/file')
+            self.assertEqual(ret, ret_exp)
+
+    def test_load_skip_render_invalid_path(self):
+        ret_exp = {'out': False, 'message': 'Invalid file path.'}
+        mock_cache_file = MagicMock(return_value='')
+        with patch('salt.utils.files.mkstemp') as mock_mkstmp, \
+                patch('shutil.copyfile') as mock_copyfile, \
+                patch('os.path.isfile') as mock_isfile, \
+                patch.dict(junos.__salt__,
+                           {'cp.cache_file': mock_cache_file}):
+            mock_mkstmp.return_value = '/path/to/file'
+            mock_isfile.return_value = False
+            ret = junos.load('/srv/cfg/missing.set', skip_render=True)
+            mock_copyfile.assert_not_called()
+            self.assertEqual(ret, ret_exp)
+
+    def test_load_skip_render_with_template_markup(self):
+        mock_cache_file = MagicMock(return_value='/cache/file.set')
+        mock_get_template = MagicMock()
+        with patch('os.path.getsize') as mock_getsize, \
+                patch('jnpr.junos.utils.config.Config.load') as mock_load, \
+                patch('salt.utils.files.mkstemp') as mock_mkstmp, \
+                patch('salt.utils.files.fopen',
+                      mock_open(read_data='set system host-name {{ grains.id }}')), \
+                patch('os.path.isfile') as mock_isfile, \
+                patch.dict(junos.__salt__,
+                           {'cp.cache_file': mock_cache_file,
+                            'cp.get_template': mock_get_template}):
+            mock_getsize.return_value = 1000
+            mock_mkstmp.return_value = '/path/to/file'
+            mock_isfile.return_value = True
+            junos.load('salt://path/to/file.set', skip_render=True)
+            mock_cache_file.assert_called_once_with('salt://path/to/file.set')
+            mock_get_template.assert_called_with('/cache/file.set',
+                                                 '/path/to/file',
+                                                 template_vars={})
+            mock_load.assert_called_with(format='set', path='/path/to/file')
+
     def test_load_error(self):
         ret_exp = {'out': False,
                    'format': 'text',
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+'''
+unit tests for the junos state
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Salt Testing libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import NO_MOCK, NO_MOCK_REASON, MagicMock, patch
+
+# Import salt libs
+import salt.state
+import salt.utils.args
+import salt.utils.data
+import salt.utils.yaml
+import salt.states.junos as junos
+from salt.ext import six
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class JunosTestCase(TestCase, LoaderModuleMockMixin):
+
+    def setup_loader_modules(self):
+        return {junos: {'__salt__': {}, '__proxy__': {}, '__context__': {}}}
+
+    def _with_proxy_timeout(self, timeout):
+        dev = MagicMock(timeout=timeout)
+        return patch.dict(junos.__proxy__,
+                          {'junos.conn': MagicMock(return_value=dev)})
+
+    def test_commit_default_timeout(self):
+        mock_commit = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with self._with_proxy_timeout(30), \
+                patch.dict(junos.__salt__, {'junos.commit': mock_commit}):
+            junos.commit('commit')
+            mock_commit.assert_called_once_with(dev_timeout=300)
+
+    def test_commit_longer_proxy_timeout(self):
+        mock_commit = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with self._with_proxy_timeout(900), \
+                patch.dict(junos.__salt__, {'junos.commit': mock_commit}):
+            junos.commit('commit')
+            mock_commit.assert_called_once_with(dev_timeout=900)
+
+    def test_commit_with_timeout(self):
+        mock_commit = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with self._with_proxy_timeout(30), \
+                patch.dict(junos.__salt__, {'junos.commit': mock_commit}):
+            junos.commit('commit', timeout=50)
+            mock_commit.assert_called_once_with(timeout=50)
+
+    def test_commit_with_dev_timeout(self):
+        mock_commit = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with self._with_proxy_timeout(30), \
+                patch.dict(junos.__salt__, {'junos.commit': mock_commit}):
+            junos.commit('commit', dev_timeout=50)
+            mock_commit.assert_called_once_with(dev_timeout=50)
+
+    def test_commit_default_timeout_without_proxy(self):
+        mock_commit = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with patch.dict(junos.__salt__, {'junos.commit': mock_commit}):
+            junos.commit('commit')
+            mock_commit.assert_called_once_with(dev_timeout=300)
+
+    def test_rollback_default_timeout(self):
+        mock_rollback = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with self._with_proxy_timeout(30), \
+                patch.dict(junos.__salt__, {'junos.rollback': mock_rollback}):
+            junos.rollback('rollback', 1)
+            mock_rollback.assert_called_once_with(id=1, dev_timeout=120)
+
+    def test_load_default_timeout(self):
+        mock_load = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with self._with_proxy_timeout(30), \
+                patch.dict(junos.__salt__, {'junos.load': mock_load}):
+            junos.load('salt://config.set')
+            mock_load.assert_called_once_with('salt://config.set',
+                                              dev_timeout=120,
+                                              skip_render=True)
+
+    def test_install_config_default_timeout(self):
+        mock_install = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with self._with_proxy_timeout(30), \
+                patch.dict(junos.__salt__,
+                           {'junos.install_config': mock_install}):
+            junos.install_config('salt://config.set')
+            mock_install.assert_called_once_with('salt://config.set',
+                                                 dev_timeout=600,
+                                                 skip_render=True)
+
+    def test_install_os_default_timeout(self):
+        mock_install = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with self._with_proxy_timeout(30), \
+                patch.dict(junos.__salt__, {'junos.install_os': mock_install}):
+            junos.install_os('salt://junos.tgz')
+            mock_install.assert_called_once_with('salt://junos.tgz',
+                                                 dev_timeout=1800)
+
+    def test_rpc_get_config_cached(self):
+        mock_rpc = MagicMock(return_value={'out': True, 'rpc_reply': 'cfg'})
+        with patch.dict(junos.__salt__, {'junos.rpc': mock_rpc}):
+            ret = junos.rpc('get-config')
+            self.assertEqual(junos.rpc('get-config'), ret)
+            self.assertEqual(mock_rpc.call_count, 1)
+
+    def test_rpc_operational_not_cached(self):
+        mock_rpc = MagicMock(return_value={'out': True, 'rpc_reply': 'up'})
+        with patch.dict(junos.__salt__, {'junos.rpc': mock_rpc}):
+            junos.rpc('get-interface-information')
+            junos.rpc('get-interface-information')
+            self.assertEqual(mock_rpc.call_count, 2)
+
+    def test_cli_show_configuration_cached(self):
+        mock_cli = MagicMock(return_value={'out': True, 'message': 'cfg'})
+        with patch.dict(junos.__salt__, {'junos.cli': mock_cli}):
+            junos.cli('show configuration system')
+            junos.cli('show configuration system')
+            self.assertEqual(mock_cli.call_count, 1)
+
+    def test_cli_operational_not_cached(self):
+        mock_cli = MagicMock(return_value={'out': True, 'message': 'storage'})
+        with patch.dict(junos.__salt__, {'junos.cli': mock_cli}):
+            junos.cli('show system storage')
+            junos.cli('show system storage')
+            self.assertEqual(mock_cli.call_count, 2)
+
+    def test_cached_reply_is_a_copy(self):
+        mock_diff = MagicMock(return_value={'out': True, 'message': 'diff'})
+        with patch.dict(junos.__salt__, {'junos.diff': mock_diff}):
+            junos.diff('diff', 0)['changes']['message'] = 'changed'
+            ret = junos.diff('diff', 0)
+            self.assertEqual(ret['changes'], {'out': True, 'message': 'diff'})
+
+    def test_cache_invalidated_by_configuration_change(self):
+        mock_diff = MagicMock(return_value={'out': True, 'message': 'diff'})
+        mock_load = MagicMock(return_value={'out': True, 'message': 'loaded'})
+        with patch.dict(junos.__salt__, {'junos.diff': mock_diff,
+                                         'junos.load': mock_load}):
+            junos.diff('diff', 0)
+            junos.load('salt://config.set')
+            junos.diff('diff', 0)
+            self.assertEqual(mock_diff.call_count, 2)
+
+    def test_cache_invalidated_by_failed_configuration_change(self):
+        mock_check = MagicMock(return_value={'out': True, 'message': 'ok'})
+        mock_load = MagicMock(side_effect=Exception('Test exception'))
+        with patch.dict(junos.__salt__, {'junos.commit_check': mock_check,
+                                         'junos.load': mock_load}):
+            junos.commit_check('check')
+            self.assertRaises(Exception, junos.load, 'salt://config.set')
+            junos.commit_check('check')
+            self.assertEqual(mock_check.call_count, 2)
+
+    def test_cache_invalidated_by_rpc(self):
+        mock_rpc = MagicMock(return_value={'out': True, 'rpc_reply': 'ok'})
+        with patch.dict(junos.__salt__, {'junos.rpc': mock_rpc}):
+            junos.rpc('get-config')
+            junos.rpc('load-configuration')
+            junos.rpc('get-config')
+            self.assertEqual(mock_rpc.call_count, 3)
+
+    def test_failed_reply_not_cached(self):
+        mock_diff = MagicMock(return_value={'out': False, 'message': 'error'})
+        with patch.dict(junos.__salt__, {'junos.diff': mock_diff}):
+            junos.diff('diff', 0)
+            ret = junos.diff('diff', 0)
+            self.assertEqual(mock_diff.call_count, 2)
+            self.assertFalse(ret['result'])
+
+    def test_rollback_passes_id_as_keyword(self):
+        mock_rollback = MagicMock(return_value={'out': True, 'message': 'ok'})
+        with patch.dict(junos.__salt__, {'junos.rollback': mock_rollback}):
+            junos.rollback('rollback', 2, confirm=5, dev_timeout=30)
+            mock_rollback.assert_called_once_with(id=2, confirm=5,
+                                                  dev_timeout=30)
+
+    def test_diff_passes_id_as_keyword(self):
+        mock_diff = MagicMock(return_value={'out': True, 'message': 'diff'})
+        with patch.dict(junos.__salt__, {'junos.diff': mock_diff}):
+            junos.diff('diff', 3)
+            mock_diff.assert_called_once_with(id=3)
+
+    def test_rpc_dest_raw_xml(self):
+        mock_rpc = MagicMock(return_value={
+            'out': True, 'message': 'RPC reply written to /tmp/rpc.xml'})
+        with patch.dict(junos.__salt__, {'junos.rpc': mock_rpc}):
+            ret = junos.rpc('get-interface-information', dest='/tmp/rpc.xml')
+            mock_rpc.assert_called_once_with('get-interface-information',
+                                             '/tmp/rpc.xml', format='xml',
+                                             args=None, raw_xml=True)
+            self.assertNotIn('rpc_reply', ret['changes'])
+
+    def test_rpc_dest_parsed_reply(self):
+        mock_rpc = MagicMock(return_value={'out': True, 'rpc_reply': 'up'})
+        with patch.dict(junos.__salt__, {'junos.rpc': mock_rpc}):
+            ret = junos.rpc('get-interface-information', dest='/tmp/rpc.xml',
+                            raw_xml=False)
+            mock_rpc.assert_called_once_with('get-interface-information',
+                                             '/tmp/rpc.xml', format='xml',
+                                             args=None, raw_xml=False)
+            self.assertEqual(ret['changes']['rpc_reply'], 'up')
+
+    def test_rpc_dest_text(self):
+        mock_rpc = MagicMock(return_value={'out': True, 'rpc_reply': 'up'})
+        with patch.dict(junos.__salt__, {'junos.rpc': mock_rpc}):
+            junos.rpc('get-interface-information', dest='/tmp/rpc.txt',
+                      format='text')
+            mock_rpc.assert_called_once_with('get-interface-information',
+                                             '/tmp/rpc.txt', format='text',
+                                             args=None)
+
+    def test_rpc_get_config_without_inherit(self):
+        mock_rpc = MagicMock(return_value={'out': True, 'rpc_reply': 'cfg'})
+        with patch.dict(junos.__salt__, {'junos.rpc': mock_rpc}):
+            junos.rpc('get-configuration')
+            mock_rpc.assert_called_once_with('get-configuration', None,
+                                             format='xml', args=None)
+
+    def test_rpc_get_config_with_inherit(self):
+        mock_rpc = MagicMock(return_value={'out': True, 'rpc_reply': 'cfg'})
+        with patch.dict(junos.__salt__, {'junos.rpc': mock_rpc}):
+            junos.rpc('get-configuration', inherit='inherit')
+            mock_rpc.assert_called_once_with('get-config', None,
+                                             format='xml', args=None,
+                                             inherit='inherit')
+
+    def _cli_command(self, name, **kwargs):
+        mock_cli = MagicMock(return_value={'out': True, 'message': 'cfg'})
+        with patch.dict(junos.__salt__, {'junos.cli': mock_cli}):
+            junos.cli(name, **kwargs)
+        return mock_cli.call_args[0][0]
+
+    def test_cli_without_inherit(self):
+        self.assertEqual(
+            self._cli_command('show configuration | display set'),
+            'show configuration | display set')
+
+    def test_cli_with_inherit(self):
+        self.assertEqual(
+            self._cli_command('show configuration system', inherit=True),
+            'show configuration system | display inheritance')
+
+    def test_cli_with_inherit_display_set(self):
+        self.assertEqual(
+            self._cli_command('show configuration | display set',
+                              inherit=True),
+            'show configuration | display inheritance | display set')
+
+    def test_cli_with_inherit_compare_rollback(self):
+        self.assertEqual(
+            self._cli_command('show configuration | compare rollback 1',
+                              inherit=True),
+            'show configuration | display inheritance | compare rollback 1')
+
+    def test_cli_with_inherit_already_displayed(self):
+        self.assertEqual(
+            self._cli_command('show configuration | display inheritance',
+                              inherit=True),
+            'show configuration | display inheritance')
+
+    def test_cli_with_inherit_operational(self):
+        self.assertEqual(
+            self._cli_command('show version', inherit=True), 'show version')
+
+    def _run_sls(self, sls):
+        '''
+        Build the low chunk of a single state the way the state compiler does
+        and, once State.verify_data has accepted it, run it with the
+        arguments State.call would pass.
+        '''
+        state_id, body = next(six.iteritems(salt.utils.yaml.safe_load(sls)))
+        fun = body['junos'][0]
+        chunk = salt.utils.data.repack_dictlist(body['junos'][1:])
+        chunk.setdefault('name', state_id)
+        chunk.update({'state': 'junos', 'fun': fun, '__id__': state_id})
+        state = MagicMock(states={'junos.file_copy': junos.file_copy})
+        verify_data = six.get_unbound_function(salt.state.State.verify_data)
+        self.assertEqual(verify_data(state, chunk), [])
+        cdata = salt.utils.args.format_call(
+            junos.file_copy,
+            chunk,
+            expected_extra_kws=salt.state.STATE_INTERNAL_KEYWORDS)
+        return junos.file_copy(*cdata['args'], **cdata['kwargs'])
+
+    def test_file_copy_files(self):
+        mock_copy = MagicMock(return_value={'out': True, 'message': 'copied'})
+        with patch.dict(junos.__salt__, {'junos.file_copy': mock_copy}):
+            ret = self._run_sls('''
+copy the files:
+  junos:
+    - file_copy
+    - files:
+      - /home/m2/info.txt
+      - /home/m2/motd.txt
+    - dest: /var/tmp
+''')
+            mock_copy.assert_called_once_with(
+                ['/home/m2/info.txt', '/home/m2/motd.txt'], '/var/tmp')
+            self.assertTrue(ret['result'])
+            self.assertEqual(ret['name'], 'copy the files')
+
+    def test_file_copy_files_concurrent(self):
+        mock_copy = MagicMock(return_value={'out': True, 'message': 'copied'})
+        with patch.dict(junos.__salt__, {'junos.file_copy': mock_copy}):
+            ret = self._run_sls('''
+copy the files:
+  junos:
+    - file_copy
+    - files:
+      - /home/m2/info.txt
+      - /home/m2/motd.txt
+    - dest: /var/tmp
+    - concurrent: True
+''')
+            self.assertEqual(mock_copy.call_count, 2)
+            mock_copy.assert_any_call('/home/m2/info.txt', '/var/tmp')
+            mock_copy.assert_any_call('/home/m2/motd.txt', '/var/tmp')
+            self.assertTrue(ret['result'])
+            self.assertEqual(sorted(ret['changes']['results']),
+                             ['/home/m2/info.txt', '/home/m2/motd.txt'])
+
+    def test_file_copy_files_parallel_keyword(self):
+        '''
+        Salt's own parallel keyword is left to the state engine and does not
+        make the files be copied concurrently.
+        '''
+        mock_copy = MagicMock(return_value={'out': True, 'message': 'copied'})
+        with patch.dict(junos.__salt__, {'junos.file_copy': mock_copy}):
+            self._run_sls('''
+copy the files:
+  junos:
+    - file_copy
+    - files:
+      - /home/m2/info.txt
+      - /home/m2/motd.txt
+    - dest: /var/tmp
+    - parallel: True
+''')
+            mock_copy.assert_called_once_with(
+                ['/home/m2/info.txt', '/home/m2/motd.txt'], '/var/tmp')
+
+    def test_file_copy_files_concurrent_failure(self):
+        def _copy(src, dest):
+            if src.endswith('motd.txt'):
+                raise Exception('Test exception')
+            return {'out': True, 'message': 'copied'}
+        mock_copy = MagicMock(side_effect=_copy)
+        with patch.dict(junos.__salt__, {'junos.file_copy': mock_copy}):
+            ret = junos.file_copy('copy the files', dest='/var/tmp',
+                                  files=['/home/m2/info.txt',
+                                         '/home/m2/motd.txt'],
+                                  concurrent=True)
+            self.assertFalse(ret['result'])
+            self.assertIn('/home/m2/motd.txt', ret['comment'])
+
+    def test_file_copy_name(self):
+        mock_copy = MagicMock(return_value={'out': True, 'message': 'copied'})
+        with patch.dict(junos.__salt__, {'junos.file_copy': mock_copy}):
+            self._run_sls('''
+/home/m2/info.txt:
+  junos:
+    - file_copy
+    - dest: info_copy.txt
+''')
+            mock_copy.assert_called_once_with('/home/m2/info.txt',
+                                              'info_copy.txt')
+
+    def test_failure_message_in_comment(self):
+        mock_commit = MagicMock(return_value={'out': False,
+                                              'message': 'Commit failed'})
+        with patch.dict(junos.__salt__, {'junos.commit': mock_commit}):
+            ret = junos.commit('commit')
+            self.assertFalse(ret['result'])
+            self.assertEqual(ret['comment'], 'Commit failed')
+
+    def test_output_not_in_comment(self):
+        mock_cli = MagicMock(return_value={'out': True,
+                                           'message': 'system { ... }'})
+        with patch.dict(junos.__salt__, {'junos.cli': mock_cli}):
+            ret = junos.cli('show configuration')
+            self.assertTrue(ret['result'])
+            self.assertEqual(ret['comment'], '')
+            self.assertEqual(ret['changes']['message'], 'system { ... }')
+
+    def test_return_template_unchanged(self):
+        mock_commit = MagicMock(return_value={'out': False,
+                                              'message': 'Commit failed'})
+        with patch.dict(junos.__salt__, {'junos.commit': mock_commit}):
+            ret = junos.commit('commit')
+            self.assertEqual(ret['name'], 'commit')
+            self.assertEqual(junos._RET_TEMPLATE,
+                             {'name': None, 'changes': {}, 'result': True,
+                              'comment': ''})